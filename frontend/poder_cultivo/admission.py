@@ -0,0 +1,138 @@
+import os, time, math, asyncio, threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+
+# Control de admisión: token bucket por cliente + límite global de concurrencia por tipo
+# de trabajo ("render" y "provider"). Si la cola de espera supera ADMISSION_MAX_QUEUE
+# se responde 503 con Retry-After en vez de acumular requests que terminarán en timeout.
+#
+# Nota: el estado es por proceso; con varios workers cada uno aplica sus propios límites.
+RATE_PER_SEC = float(os.environ.get("ADMISSION_RATE_PER_SEC", "1"))
+BURST = int(os.environ.get("ADMISSION_BURST", "5"))
+MAX_CLIENTS = int(os.environ.get("ADMISSION_MAX_CLIENTS", "10000"))
+RETRY_AFTER = int(os.environ.get("ADMISSION_RETRY_AFTER", "2"))
+LIMITS = {
+    "render": int(os.environ.get("ADMISSION_RENDER_CONCURRENCY", "4")),
+    "provider": int(os.environ.get("ADMISSION_PROVIDER_CONCURRENCY", "8")),
+}
+MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", "16"))
+# IPs de proxies propios (coma separadas). Alternativa: uvicorn --proxy-headers /
+# gunicorn forwarded_allow_ips, que ya reescriben request.client.
+TRUSTED_PROXIES = {ip.strip() for ip in os.environ.get("ADMISSION_TRUSTED_PROXIES", "").split(",") if ip.strip()}
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, n: float = 1) -> bool:
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= n:
+                self.tokens -= n
+                return True
+            return False
+
+    def wait_time(self, n: float = 1) -> float:
+        """Segundos hasta que haya `n` tokens disponibles."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= n or self.rate <= 0:
+                return 0.0
+            return (n - self.tokens) / self.rate
+
+class _Pool:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.sem = asyncio.Semaphore(limit)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = 0
+
+_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+_buckets_lock = threading.Lock()
+_pools = {kind: _Pool(limit) for kind, limit in LIMITS.items()}
+_rate_limited = 0
+
+def client_id(request: Request) -> str:
+    """Clave del bucket: IP del peer. X-Forwarded-For solo se considera si el peer es un
+    proxy de confianza (ADMISSION_TRUSTED_PROXIES); se toma el primer salto no confiable
+    desde la derecha, que es el único que no pudo escribir el cliente."""
+    peer = request.client.host if request.client else "unknown"
+    if peer not in TRUSTED_PROXIES:
+        return peer
+    hops = [h.strip() for h in request.headers.get("x-forwarded-for", "").split(",") if h.strip()]
+    for hop in reversed(hops):
+        if hop not in TRUSTED_PROXIES:
+            return hop
+    return peer
+
+def _bucket_for(cid: str) -> TokenBucket:
+    with _buckets_lock:
+        b = _buckets.get(cid)
+        if b is None:
+            b = _buckets[cid] = TokenBucket(RATE_PER_SEC, BURST)
+            # LRU acotado para no crecer sin límite con IPs distintas
+            while len(_buckets) > MAX_CLIENTS:
+                _buckets.popitem(last=False)
+        else:
+            _buckets.move_to_end(cid)
+        return b
+
+async def rate_limit(request: Request):
+    """Dependencia FastAPI: 429 + Retry-After si el cliente agotó su bucket."""
+    global _rate_limited
+    b = _bucket_for(client_id(request))
+    if not b.take():
+        _rate_limited += 1
+        retry = max(1, math.ceil(b.wait_time()))
+        raise HTTPException(429, "Demasiadas solicitudes", headers={"Retry-After": str(retry)})
+
+@asynccontextmanager
+async def slot(kind: str):
+    pool = _pools[kind]
+    if pool.sem.locked() and pool.waiting >= MAX_QUEUE:
+        pool.shed += 1
+        raise HTTPException(503, "Servicio saturado, reintente", headers={"Retry-After": str(RETRY_AFTER)})
+    pool.waiting += 1
+    try:
+        await pool.sem.acquire()
+    finally:
+        pool.waiting -= 1
+    pool.active += 1
+    pool.admitted += 1
+    try:
+        yield
+    finally:
+        pool.active -= 1
+        pool.sem.release()
+
+async def run(kind: str, fn, *args, **kwargs):
+    """Ejecuta `fn` (bloqueante) en el threadpool dentro del límite de concurrencia `kind`."""
+    async with slot(kind):
+        return await run_in_threadpool(fn, *args, **kwargs)
+
+def snapshot() -> dict:
+    return {
+        "pid": os.getpid(),
+        "rate_per_sec": RATE_PER_SEC,
+        "burst": BURST,
+        "max_queue": MAX_QUEUE,
+        "clients_tracked": len(_buckets),
+        "rate_limited": _rate_limited,
+        "pools": {
+            kind: {"limit": p.limit, "active": p.active, "waiting": p.waiting,
+                   "admitted": p.admitted, "shed": p.shed}
+            for kind, p in _pools.items()
+        },
+    }
@@ -1,5 +1,5 @@
-import os, base64, io, datetime
-from fastapi import FastAPI, HTTPException, Request, Depends
+import os, base64, io, datetime, hmac
+from fastapi import FastAPI, HTTPException, Request, Depends, Header
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
@@ -7,10 +7,16 @@ from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from models import PoderCreate
 import storage
+import admission
+import artifact_cache
+import declaraciones
 from provider_clients import ecert as ecert_client
 from provider_clients import idok as idok_client
 
 storage.init_db()
+declaraciones.load_registry()
+
+APP_SECRET = os.environ.get("APP_SECRET", "")
 
 app = FastAPI(title="Poder Cultivo – Ley 20.000 (CL)")
 
@@ -29,10 +35,14 @@ env = Environment(
     autoescape=select_autoescape()
 )
 
-def render_html(data: dict) -> str:
+TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), "templates", "poder.html")
+with open(TEMPLATE_PATH, "rb") as _f:
+    TEMPLATE_HASH = artifact_cache.content_key(_f.read())
+
+def render_html(data: dict, hoy: str = None) -> str:
     t = env.get_template("poder.html")
-    hoy = datetime.datetime.now().strftime("%d-%m-%Y")
-    d = data.copy()
+    hoy = hoy or datetime.datetime.now().strftime("%d-%m-%Y")
+    d = declaraciones.with_text(data).copy()
     d["hoy"] = hoy
     if d.get("vigencia") == "indefinido":
         d["vigencia_texto"] = "indefinida"
@@ -42,42 +52,71 @@ def render_html(data: dict) -> str:
         d["vigencia_texto"] = f"desde {fi} hasta {ft}"
     return t.render(**d)
 
+def render_pdf(data: dict) -> bytes:
+    """Documento final, reutilizado entre workers vía artifact_cache."""
+    hoy = datetime.datetime.now().strftime("%d-%m-%Y")
+    key = artifact_cache.content_key(TEMPLATE_HASH, hoy, data)
+    def build_html():
+        return render_html(data, hoy).encode("utf-8")
+    def build_pdf():
+        html = artifact_cache.get_or_create(key, "html", build_html)
+        # Para producción: from weasyprint import HTML; return HTML(string=html.decode("utf-8")).write_pdf()
+        return html  # placeholder
+    try:
+        return artifact_cache.get_or_create(key, "pdf", build_pdf)
+    except KeyError:
+        raise HTTPException(500, "Declaración del poder no encontrada")
+
 @app.post("/api/poder", response_model=dict)
 async def create_poder(payload: PoderCreate):
-    pid = storage.insert_poder(payload.model_dump())
+    try:
+        data = declaraciones.to_ref(payload.model_dump())
+    except KeyError:
+        raise HTTPException(400, "Declaración no registrada")
+    pid = storage.insert_poder(data)
     return {"id": pid, "status": "draft"}
 
+@app.get("/api/declaraciones", response_model=list)
+async def list_declaraciones():
+    return declaraciones.versions()
+
+@app.get("/api/declaraciones/{ref}", response_model=dict)
+async def get_declaracion(ref: str):
+    h = declaraciones.ref_for(ref)
+    if h is None: raise HTTPException(404, "Declaración no existe")
+    return {"hash": h, "texto": declaraciones.resolve(h)}
+
 class ProviderIn(BaseModel):
     provider: str  # "ecert" | "idok"
 
-@app.post("/api/poder/{pid}/pdf", response_model=dict)
+@app.post("/api/poder/{pid}/pdf", response_model=dict, dependencies=[Depends(admission.rate_limit)])
 async def generate_pdf(pid: int):
     poder = storage.get_poder(pid)
     if not poder: raise HTTPException(404, "Poder no existe")
-    html = render_html(poder["data"])
+    pdf_bytes = await admission.run("render", render_pdf, poder["data"])
     # Para producción: usar WeasyPrint o similar. Aquí devolvemos base64 de HTML como marcador.
-    pdf_b64 = base64.b64encode(html.encode("utf-8")).decode("utf-8")
+    pdf_b64 = base64.b64encode(pdf_bytes).decode("utf-8")
     return {"id": pid, "pdf_base64_html": pdf_b64}
 
-@app.post("/api/poder/{pid}/send-to-sign", response_model=dict)
+@app.post("/api/poder/{pid}/send-to-sign", response_model=dict, dependencies=[Depends(admission.rate_limit)])
 async def send_to_sign(pid: int, provider_in: ProviderIn):
     poder = storage.get_poder(pid)
     if not poder: raise HTTPException(404, "Poder no existe")
+    if provider_in.provider not in ("ecert", "idok"):
+        raise HTTPException(400, "Proveedor no soportado")
 
     # Genera documento (en producción: PDF real)
-    html = render_html(poder["data"])
-    # Marcardor: en producción conviértelo a PDF con WeasyPrint y codifica base64
-    # from weasyprint import HTML; pdf_bytes = HTML(string=html).write_pdf()
-    pdf_bytes = html.encode("utf-8")  # placeholder
+    # Marcardor: en producción render_pdf lo convierte a PDF con WeasyPrint
+    pdf_bytes = await admission.run("render", render_pdf, poder["data"])
     pdf_b64 = base64.b64encode(pdf_bytes).decode("utf-8")
     poder["pdf_base64"] = pdf_b64
 
     if provider_in.provider == "ecert":
-        result = ecert_client.create_envelope(poder)
-        storage.update_poder(pid, status="sent_to_sign", provider="ecert", provider_envelope_id="TBD")
+        result = await admission.run("provider", ecert_client.create_envelope, poder)
+        storage.update_poder(pid, status="sent_to_sign", provider="ecert", provider_envelope_id=result.get("envelope_id"))
     elif provider_in.provider == "idok":
-        result = idok_client.create_envelope(poder)
-        storage.update_poder(pid, status="sent_to_sign", provider="idok", provider_envelope_id="TBD")
+        result = await admission.run("provider", idok_client.create_envelope, poder)
+        storage.update_poder(pid, status="sent_to_sign", provider="idok", provider_envelope_id=result.get("envelope_id"))
     else:
         raise HTTPException(400, "Proveedor no soportado")
 
@@ -97,6 +136,18 @@ async def webhook_idok(request: Request):
     # Validar firma con secreto IDOK_WEBHOOK_SECRET
     return JSONResponse({"ok": True})
 
+def require_admin(x_admin_token: str = Header(default="")):
+    if not APP_SECRET or not hmac.compare_digest(x_admin_token.encode("utf-8"), APP_SECRET.encode("utf-8")):
+        raise HTTPException(403, "No autorizado")
+
+@app.get("/admin/admission", response_model=dict, dependencies=[Depends(require_admin)])
+async def admission_state():
+    return admission.snapshot()
+
+@app.get("/admin/artifact-cache", response_model=dict, dependencies=[Depends(require_admin)])
+def artifact_cache_state():
+    return artifact_cache.stats()
+
 @app.get("/", response_class=HTMLResponse)
 async def root():
     return "<h3>Poder Cultivo – API</h3><p>POST /api/poder, /api/poder/{id}/send-to-sign</p>"
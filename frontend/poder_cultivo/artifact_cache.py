@@ -0,0 +1,98 @@
+import os, hashlib, json, tempfile
+
+# Caché en disco de artefactos renderizados (HTML/PDF), compartida entre workers y
+# persistente entre reinicios. Clave = sha256 del contenido de entrada; escrituras
+# atómicas (tmp + os.replace) y eviction por tamaño (más antiguos por mtime primero).
+CACHE_DIR = os.environ.get("ARTIFACT_CACHE_DIR", "./.artifact_cache")
+MAX_BYTES = int(os.environ.get("ARTIFACT_CACHE_MAX_MB", "256")) * 1024 * 1024
+ENABLED = os.environ.get("ARTIFACT_CACHE_ENABLED", "1") not in ("0", "false", "no")
+
+_written_since_evict = 0
+
+def content_key(*parts) -> str:
+    h = hashlib.sha256()
+    for p in parts:
+        if isinstance(p, (dict, list)):
+            p = json.dumps(p, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        if isinstance(p, str):
+            p = p.encode("utf-8")
+        h.update(p)
+        h.update(b"\0")
+    return h.hexdigest()
+
+def _path(key: str, kind: str) -> str:
+    return os.path.join(CACHE_DIR, key[:2], f"{key}.{kind}")
+
+def get(key: str, kind: str):
+    if not ENABLED: return None
+    path = _path(key, kind)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(path)  # marca de uso reciente para la eviction
+    except OSError:
+        pass
+    return data
+
+def put(key: str, kind: str, data: bytes):
+    global _written_since_evict
+    if not ENABLED: return
+    path = _path(key, kind)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try: os.unlink(tmp)
+        except OSError: pass
+        raise
+    # Revisar el tamaño total cada ~10% de MAX_BYTES escritos (por proceso)
+    _written_since_evict += len(data)
+    if _written_since_evict >= MAX_BYTES // 10:
+        _written_since_evict = 0
+        evict()
+
+def get_or_create(key: str, kind: str, build) -> bytes:
+    data = get(key, kind)
+    if data is None:
+        data = build()
+        put(key, kind, data)
+    return data
+
+def _entries():
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            if name.startswith(".tmp-"): continue
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue  # eliminado por otro worker
+            yield st.st_mtime, st.st_size, path
+
+def evict(max_bytes: int = None) -> int:
+    """Elimina los artefactos menos usados hasta quedar bajo el 90% del límite. Retorna bytes liberados."""
+    limit = MAX_BYTES if max_bytes is None else max_bytes
+    entries = list(_entries())
+    total = sum(size for _, size, _ in entries)
+    if total <= limit: return 0
+    target = int(limit * 0.9)
+    freed = 0
+    for _, size, path in sorted(entries):
+        if total - freed <= target: break
+        try:
+            os.unlink(path)
+            freed += size
+        except FileNotFoundError:
+            pass
+    return freed
+
+def stats() -> dict:
+    entries = list(_entries())
+    return {"dir": os.path.abspath(CACHE_DIR), "enabled": ENABLED, "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries), "max_bytes": MAX_BYTES}
@@ -0,0 +1,46 @@
+import json, timeit
+from typing import List
+
+from models import PoderCreate, PoderCreateList, validate_many
+from rut import normalize_rut, digito_verificador
+
+# Micro-benchmark del costo de validación por registro (individual vs. lote).
+# Uso: python bench_validation.py [N]
+BASE = {
+    "finalidad": "medicinal", "vigencia": "fijo", "fecha_inicio": "2025-01-01",
+    "fecha_termino": "2025-12-31", "cantidad_plantas": 6, "declaracion_id": "2025_01",
+    "cedente_nombre": "Juan Pérez", "cedente_domicilio": "Av. Siempre Viva 123", "cedente_email": "juan@example.cl",
+    "cesionario_nombre": "Apex Remedy", "cesionario_rut": "76.086.428-5",
+    "cesionario_domicilio": "Santiago", "cesionario_email": "contacto@example.cl",
+    "direccion_cultivo": "Av. Siempre Viva 123", "comuna_region": "Santiago, RM",
+}
+
+def payloads(n: int):
+    out = []
+    for i in range(n):
+        cuerpo = 10_000_000 + i
+        d = dict(BASE)
+        d["cedente_rut"] = f"{cuerpo:,}".replace(",", ".") + "-" + digito_verificador(cuerpo)
+        out.append(d)
+    return out
+
+def per_record_us(fn, n: int, repeat: int = 5) -> float:
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) / n * 1e6
+
+if __name__ == "__main__":
+    import sys
+    from pydantic import TypeAdapter
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    items = payloads(n)
+    one = items[:1]
+    raw = json.dumps(items).encode("utf-8")
+    print(f"registros: {n} (EmailStr domina el costo por registro)")
+    print(f"normalize_rut sin caché           {per_record_us(lambda: [normalize_rut.__wrapped__(d['cedente_rut']) for d in items], n):9.2f} µs/registro")
+    print("-- individual")
+    print(f"PoderCreate.model_validate        {per_record_us(lambda: PoderCreate.model_validate(one[0]), 1, 200):9.2f} µs/registro")
+    print(f"validate_many([x]) (adapter fijo) {per_record_us(lambda: validate_many(one), 1, 200):9.2f} µs/registro")
+    print(f"TypeAdapter nuevo por request     {per_record_us(lambda: TypeAdapter(List[PoderCreate]).validate_python(one), 1, 200):9.2f} µs/registro")
+    print("-- lote")
+    print(f"PoderCreate.model_validate x N    {per_record_us(lambda: [PoderCreate.model_validate(d) for d in items], n):9.2f} µs/registro")
+    print(f"validate_many (TypeAdapter)       {per_record_us(lambda: validate_many(items), n):9.2f} µs/registro")
+    print(f"PoderCreateList.validate_json     {per_record_us(lambda: PoderCreateList.validate_json(raw), n):9.2f} µs/registro")
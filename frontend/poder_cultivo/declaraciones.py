@@ -0,0 +1,103 @@
+import os, glob, hashlib, threading
+
+import storage
+
+# Registro versionado de textos de declaración (declaracion_<version>.txt).
+# Los clientes pueden referenciar una declaración por versión ("2025_01") o por hash;
+# en la BD cada texto se guarda una vez y los poderes solo almacenan "declaracion_ref".
+DIR = os.path.dirname(os.path.abspath(__file__))
+
+_versions = {}  # version -> hash
+# Caché en memoria solo de aciertos: un hash desconocido en este worker puede existir
+# más tarde (lo interna otro worker), así que los fallos siempre van a la BD.
+CACHE_MAX = 1024
+_textos = {}  # hash -> texto
+_textos_lock = threading.Lock()
+
+def normalize(texto: str) -> str:
+    return texto.replace("\r\n", "\n").strip()
+
+def text_hash(texto: str) -> str:
+    return hashlib.sha256(normalize(texto).encode("utf-8")).hexdigest()
+
+def load_registry():
+    """Carga los archivos declaracion_*.txt y los registra en la BD."""
+    for path in sorted(glob.glob(os.path.join(DIR, "declaracion_*.txt"))):
+        version = os.path.basename(path)[len("declaracion_"):-len(".txt")]
+        with open(path, encoding="utf-8") as f:
+            texto = normalize(f.read())
+        h = text_hash(texto)
+        storage.intern_declaracion(h, texto, version)
+        _versions[version] = h
+
+def versions() -> list:
+    return [{"id": v, "hash": h} for v, h in sorted(_versions.items())]
+
+def ref_for(id_or_hash: str):
+    """Hash para una versión o hash conocido; None si no existe."""
+    if id_or_hash in _versions:
+        return _versions[id_or_hash]
+    return id_or_hash if resolve(id_or_hash) is not None else None
+
+def intern(texto: str) -> str:
+    h = text_hash(texto)
+    if resolve(h) is None:
+        storage.intern_declaracion(h, normalize(texto))
+    return h
+
+def resolve(h: str):
+    """Texto de la declaración o None. Los textos son inmutables por hash, así que los aciertos se cachean."""
+    texto = _textos.get(h)
+    if texto is not None:
+        return texto
+    texto = storage.get_declaracion(h)
+    if texto is not None:
+        with _textos_lock:
+            while len(_textos) >= CACHE_MAX:
+                _textos.pop(next(iter(_textos)))
+            _textos[h] = texto
+    return texto
+
+def to_ref(data: dict) -> dict:
+    """Reemplaza declaracion/declaracion_id por declaracion_ref antes de persistir."""
+    d = dict(data)
+    texto = d.pop("declaracion", None)
+    decl_id = d.pop("declaracion_id", None)
+    if decl_id:
+        ref = ref_for(decl_id)
+        if ref is None:
+            raise KeyError(decl_id)
+        d["declaracion_ref"] = ref
+    elif texto is not None:
+        d["declaracion_ref"] = intern(texto)
+    return d
+
+def with_text(data: dict) -> dict:
+    """Inverso de to_ref para renderizar; los registros antiguos con texto completo pasan tal cual.
+    KeyError si la referencia no existe: nunca se renderiza el documento sin declaración."""
+    ref = data.get("declaracion_ref")
+    if ref is None or "declaracion" in data:
+        return data
+    texto = resolve(ref)
+    if texto is None:
+        raise KeyError(ref)
+    d = dict(data)
+    d["declaracion"] = texto
+    return d
+
+def migrate_existing(batch: int = 500) -> int:
+    """Convierte poderes que aún guardan el texto completo. Retorna filas actualizadas."""
+    last, total = 0, 0
+    while True:
+        rows = storage.list_poder_data(last, batch)
+        if not rows: return total
+        last = rows[-1][0]
+        changed = [(pid, to_ref(d)) for pid, d in rows if "declaracion" in d]
+        if changed:
+            storage.update_poder_data_many(changed)
+            total += len(changed)
+
+if __name__ == "__main__":
+    storage.init_db()
+    load_registry()
+    print(f"Poderes migrados: {migrate_existing()}")
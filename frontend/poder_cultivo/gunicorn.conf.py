@@ -0,0 +1,16 @@
+import os, multiprocessing
+
+# Modo producción multi-worker: ./run.sh prod  (o: gunicorn -c gunicorn.conf.py app:app)
+# Reinicio gradual:  kill -HUP <pid master>   → recicla workers (con preload no recarga código)
+# Actualizar código: kill -USR2 <pid master>  → lanza un master nuevo; luego kill -TERM <pid viejo>
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.environ.get("WORKER_TIMEOUT", "60"))
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+# Recicla workers periódicamente para acotar fugas de memoria
+max_requests = int(os.environ.get("MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.environ.get("MAX_REQUESTS_JITTER", "200"))
+accesslog = "-"
@@ -1,5 +1,7 @@
-from pydantic import BaseModel, Field, EmailStr
-from typing import Optional, Literal
+from pydantic import BaseModel, Field, EmailStr, TypeAdapter, model_validator
+from typing import Optional, Literal, List
+
+from rut import Rut
 
 class PoderCreate(BaseModel):
     finalidad: Literal["personal", "medicinal", "cientifico"]
@@ -7,15 +9,17 @@ class PoderCreate(BaseModel):
     fecha_inicio: str
     fecha_termino: Optional[str] = None
     cantidad_plantas: Optional[int] = None
-    declaracion: str
+    # Texto completo o referencia a una declaración registrada (versión "2025_01" o hash)
+    declaracion: Optional[str] = None
+    declaracion_id: Optional[str] = None
 
     cedente_nombre: str
-    cedente_rut: str
+    cedente_rut: Rut
     cedente_domicilio: str
     cedente_email: EmailStr
 
     cesionario_nombre: str
-    cesionario_rut: str
+    cesionario_rut: Rut
     cesionario_domicilio: str
     cesionario_email: EmailStr
 
@@ -26,6 +30,19 @@ class PoderCreate(BaseModel):
     firma_cedente: Optional[str] = None
     firma_cesionario: Optional[str] = None
 
+    @model_validator(mode="after")
+    def _declaracion_o_id(self):
+        if self.declaracion is None and not self.declaracion_id:
+            raise ValueError("Debe indicar declaracion o declaracion_id")
+        return self
+
+# Validador de lotes construido una sola vez (evita reconstruir el schema por request)
+PoderCreateList = TypeAdapter(List[PoderCreate])
+
+def validate_many(items) -> List[PoderCreate]:
+    """Valida una lista de payloads (dicts) de una vez."""
+    return PoderCreateList.validate_python(items)
+
 class Poder(BaseModel):
     id: int
     status: str = "draft"  # draft | sent_to_sign | signed | rejected | cancelled
@@ -1,6 +1,9 @@
 import os, http.client, json, base64
 from typing import Dict, Any
 
+from provider_clients.oauth import TokenManager
+from provider_clients.transport import KeepAlive, envelope_id
+
 # === Este es un stub. Debes completar con la documentación oficial de e-certchile/ECERT ===
 # Flujo típico:
 # 1) Autenticación OAuth2 / API key según proveedor.
@@ -18,20 +21,19 @@ CLIENT_ID = os.environ.get("ECERT_CLIENT_ID", "")
 CLIENT_SECRET = os.environ.get("ECERT_CLIENT_SECRET", "")
 TENANT = os.environ.get("ECERT_TENANT", "")
 PUBLIC_BASE = os.environ.get("PUBLIC_BASE_URL", "")
+TOKEN_URL = os.environ.get("ECERT_TOKEN_URL", "") or f"{BASE}/oauth/token"  # path ficticio
+SCOPE = os.environ.get("ECERT_SCOPE", "")
+
+tokens = TokenManager(TOKEN_URL, CLIENT_ID, CLIENT_SECRET, scope=SCOPE,
+                      cache_dir=os.environ.get("OAUTH_TOKEN_CACHE_DIR", ""))
+
+# Conexión keep-alive por hilo (reutilizada por create_envelope y la reconciliación)
+_transport = KeepAlive(BASE)
 
 def _http(method, path, body=None, headers=None):
     assert BASE, "Configura ECERT_BASE_URL"
-    if BASE.startswith("https://"):
-        host = BASE.replace("https://", "")
-        conn = http.client.HTTPSConnection(host)
-    else:
-        host = BASE.replace("http://", "")
-        conn = http.client.HTTPConnection(host)
     payload = json.dumps(body) if isinstance(body, dict) else body
-    conn.request(method, path, payload, headers or {})
-    resp = conn.getresponse()
-    data = resp.read()
-    return resp.status, resp.reason, data
+    return _transport.send(method, path, payload, headers or {})
 
 def create_envelope(poder: Dict[str, Any]) -> Dict[str, Any]:
     # Construye payload estándar.
@@ -52,5 +54,23 @@ def create_envelope(poder: Dict[str, Any]) -> Dict[str, Any]:
     }
     # Ejemplo de path ficticio:
     path = "/v1/envelopes"
-    status, reason, data = _http("POST", path, envelope, headers={"Content-Type":"application/json","Authorization":"Bearer REEMPLAZAR_TOKEN"})
-    return {"status": status, "reason": reason, "raw": data.decode("utf-8", "ignore")}
+    status, reason, data = tokens.request(
+        lambda auth: _http("POST", path, envelope, headers={"Content-Type":"application/json", **auth}))
+    return {"status": status, "reason": reason, "raw": data.decode("utf-8", "ignore"), "envelope_id": envelope_id(data)}
+
+# Estados del proveedor -> estados de Poder (ver models.Poder). Ajustar a la API real.
+STATUS_MAP = {"pending": "sent_to_sign", "in_progress": "sent_to_sign", "completed": "signed",
+              "signed": "signed", "rejected": "rejected", "declined": "rejected",
+              "cancelled": "cancelled", "expired": "cancelled"}
+BATCH_SIZE = 100
+
+def get_envelopes_status(envelope_ids) -> Dict[str, Any]:
+    """Consulta en lote. Retorna {envelope_id: estado de Poder o None si es desconocido}."""
+    path = "/v1/envelopes/status"  # path ficticio
+    status, reason, data = tokens.request(
+        lambda auth: _http("POST", path, {"ids": list(envelope_ids)}, headers={"Content-Type":"application/json", **auth}))
+    if status != 200:
+        raise RuntimeError(f"ECERT {status} {reason}")
+    items = json.loads(data).get("envelopes", [])
+    found = {str(it.get("id")): STATUS_MAP.get(str(it.get("status", "")).lower()) for it in items}
+    return {eid: found.get(eid) for eid in envelope_ids}
@@ -1,26 +1,28 @@
 import os, http.client, json, base64
 from typing import Dict, Any
 
+from provider_clients.oauth import TokenManager
+from provider_clients.transport import KeepAlive, envelope_id
+
 # === Stub para IDOK/FirmaYa ===
 BASE = os.environ.get("IDOK_BASE_URL", "").rstrip('/')
 API_KEY = os.environ.get("IDOK_API_KEY", "")
 PUBLIC_BASE = os.environ.get("PUBLIC_BASE_URL", "")
+# Si IDOK migra a OAuth2: definir IDOK_TOKEN_URL/IDOK_CLIENT_ID/IDOK_CLIENT_SECRET
+TOKEN_URL = os.environ.get("IDOK_TOKEN_URL", "")
+tokens = TokenManager(TOKEN_URL, os.environ.get("IDOK_CLIENT_ID", ""), os.environ.get("IDOK_CLIENT_SECRET", ""),
+                      cache_dir=os.environ.get("OAUTH_TOKEN_CACHE_DIR", "")) if TOKEN_URL else None
+
+# Conexión keep-alive por hilo (reutilizada por create_envelope y la reconciliación)
+_transport = KeepAlive(BASE)
 
 def _http(method, path, body=None, headers=None):
     assert BASE, "Configura IDOK_BASE_URL"
-    if BASE.startswith("https://"):
-        host = BASE.replace("https://", "")
-        conn = http.client.HTTPSConnection(host)
-    else:
-        host = BASE.replace("http://", "")
-        conn = http.client.HTTPConnection(host)
     payload = json.dumps(body) if isinstance(body, dict) else body
-    base_headers = {"Content-Type":"application/json","X-API-Key": API_KEY}
+    base_headers = {"Content-Type":"application/json"}
+    if tokens is None: base_headers["X-API-Key"] = API_KEY  # con OAuth va el Bearer de tokens.request
     if headers: base_headers.update(headers)
-    conn.request(method, path, payload, base_headers)
-    resp = conn.getresponse()
-    data = resp.read()
-    return resp.status, resp.reason, data
+    return _transport.send(method, path, payload, base_headers)
 
 def create_envelope(poder: Dict[str, Any]) -> Dict[str, Any]:
     callback = f"{PUBLIC_BASE}/webhooks/idok"
@@ -39,5 +41,25 @@ def create_envelope(poder: Dict[str, Any]) -> Dict[str, Any]:
     }
     # Path ficticio para ilustrar:
     path = "/api/v1/envelopes"
-    status, reason, data = _http("POST", path, envelope)
-    return {"status": status, "reason": reason, "raw": data.decode("utf-8","ignore")}
+    if tokens:
+        status, reason, data = tokens.request(lambda auth: _http("POST", path, envelope, headers=auth))
+    else:
+        status, reason, data = _http("POST", path, envelope)
+    return {"status": status, "reason": reason, "raw": data.decode("utf-8","ignore"), "envelope_id": envelope_id(data)}
+
+# Estados del proveedor -> estados de Poder. Ajustar a la API real.
+STATUS_MAP = {"pending": "sent_to_sign", "sent": "sent_to_sign", "signed": "signed", "completed": "signed",
+              "rejected": "rejected", "cancelled": "cancelled", "canceled": "cancelled", "expired": "cancelled"}
+
+def get_envelope_status(eid: str):
+    """IDOK no tiene endpoint de lote: consulta individual. None si el estado es desconocido."""
+    path = f"/api/v1/envelopes/{eid}"  # path ficticio
+    if tokens:
+        status, reason, data = tokens.request(lambda auth: _http("GET", path, headers=auth))
+    else:
+        status, reason, data = _http("GET", path)
+    if status == 404:
+        return None
+    if status != 200:
+        raise RuntimeError(f"IDOK {status} {reason}")
+    return STATUS_MAP.get(str(json.loads(data).get("status", "")).lower())
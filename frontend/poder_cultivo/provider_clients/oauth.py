@@ -0,0 +1,167 @@
+import os, json, time, hashlib, tempfile, threading, http.client
+from contextlib import contextmanager
+from urllib.parse import urlsplit, urlencode
+try:
+    import fcntl
+except ImportError:  # Windows: sin lock entre procesos
+    fcntl = None
+
+# Token manager OAuth2 (client credentials) compartido por los clientes de proveedor.
+# - Caché en memoria y, si se indica cache_dir, en disco para que otros workers lo reutilicen.
+# - Refresco proactivo `refresh_margin` segundos antes de expirar: un solo hilo refresca
+#   (single-flight) mientras los demás siguen usando el token vigente.
+# - request() reintenta una vez con token nuevo si el proveedor responde 401.
+
+class TokenError(Exception):
+    pass
+
+def _post_form(url: str, form: dict, timeout: float = 15):
+    parts = urlsplit(url)
+    conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    conn = conn_cls(parts.netloc, timeout=timeout)
+    path = parts.path or "/"
+    if parts.query: path += "?" + parts.query
+    try:
+        conn.request("POST", path, urlencode(form), {"Content-Type": "application/x-www-form-urlencoded",
+                                                     "Accept": "application/json"})
+        resp = conn.getresponse()
+        data = resp.read()
+    finally:
+        conn.close()
+    return resp.status, resp.reason, data
+
+class TokenManager:
+    def __init__(self, token_url: str, client_id: str, client_secret: str, scope: str = "",
+                 refresh_margin: int = 60, cache_dir: str = "", fetch=_post_form):
+        self.token_url = token_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.scope = scope
+        self.refresh_margin = refresh_margin
+        self._fetch = fetch
+        self._token = None
+        self._expires_at = 0.0
+        self._margin = refresh_margin  # margen efectivo del token actual (ver _effective_margin)
+        self._lock = threading.Lock()
+        self._cache_path = None
+        if cache_dir:
+            key = hashlib.sha256(f"{token_url}|{client_id}|{scope}".encode("utf-8")).hexdigest()[:16]
+            self._cache_path = os.path.join(cache_dir, f"oauth-{key}.json")
+
+    def _valid(self, margin: float) -> bool:
+        return self._token is not None and time.time() < self._expires_at - margin
+
+    def _effective_margin(self, lifetime: float) -> float:
+        # Con tokens de vida <= refresh_margin (p. ej. 60 s) el token nunca contaría como
+        # vigente y cada llamada pediría uno nuevo: se refresca a mitad de su vida.
+        return min(self.refresh_margin, lifetime / 2)
+
+    def token(self) -> str:
+        if self._valid(self._margin):
+            return self._token
+        if self._valid(0):
+            # Aún vigente: refresca solo un hilo, el resto usa el token actual
+            if self._lock.acquire(blocking=False):
+                try:
+                    if not self._valid(self._margin):
+                        self._refresh()
+                except Exception:
+                    pass  # se reintentará en la próxima llamada; el token actual sigue sirviendo
+                finally:
+                    self._lock.release()
+            return self._token
+        with self._lock:
+            if not self._valid(0):
+                self._refresh()
+            return self._token
+
+    def invalidate(self, token: str = None):
+        with self._lock:
+            if token is None or token == self._token:
+                self._token, self._expires_at, self._margin = None, 0.0, self.refresh_margin
+                if self._cache_path:
+                    self._invalidate_disk(token)
+
+    def _invalidate_disk(self, token):
+        # Solo se descarta el token en disco si es el mismo que falló: otro worker puede
+        # haber guardado uno más nuevo. Se sobrescribe atómicamente con uno ya expirado.
+        with self._disk_lock():
+            try:
+                with open(self._cache_path, encoding="utf-8") as f:
+                    cached = json.load(f)
+            except (OSError, ValueError):
+                return
+            if token is None or cached.get("access_token") == token:
+                self._write_disk({"access_token": cached.get("access_token"), "expires_at": 0})
+
+    def _refresh(self):
+        # Llamar con self._lock tomado
+        if self._load_disk():
+            return
+        form = {"grant_type": "client_credentials", "client_id": self.client_id,
+                "client_secret": self.client_secret}
+        if self.scope: form["scope"] = self.scope
+        status, reason, data = self._fetch(self.token_url, form)
+        if status != 200:
+            raise TokenError(f"Token endpoint {status} {reason}: {data[:200]!r}")
+        try:
+            body = json.loads(data)
+            token = body["access_token"]
+            lifetime = int(body.get("expires_in", 3600))
+        except (ValueError, TypeError, KeyError) as e:
+            raise TokenError(f"Respuesta de token inválida: {data[:200]!r}") from e
+        self._token = token
+        self._expires_at = time.time() + lifetime
+        self._margin = self._effective_margin(lifetime)
+        self._save_disk()
+
+    def _load_disk(self) -> bool:
+        if not self._cache_path: return False
+        try:
+            with open(self._cache_path, encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        margin = cached.get("margin", self.refresh_margin)
+        if time.time() >= cached.get("expires_at", 0) - margin:
+            return False
+        self._token, self._expires_at, self._margin = cached["access_token"], cached["expires_at"], margin
+        return True
+
+    @contextmanager
+    def _disk_lock(self):
+        os.makedirs(os.path.dirname(self._cache_path), exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(self._cache_path + ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _save_disk(self):
+        if not self._cache_path: return
+        with self._disk_lock():
+            self._write_disk({"access_token": self._token, "expires_at": self._expires_at,
+                              "margin": self._margin})
+
+    def _write_disk(self, entry: dict):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self._cache_path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp, self._cache_path)
+        except OSError:
+            try: os.unlink(tmp)
+            except OSError: pass
+
+    def request(self, send):
+        """send(headers) -> (status, reason, data). Reintenta una vez si la respuesta es 401."""
+        token = self.token()
+        result = send({"Authorization": f"Bearer {token}"})
+        if result[0] == 401:
+            self.invalidate(token)
+            result = send({"Authorization": f"Bearer {self.token()}"})
+        return result
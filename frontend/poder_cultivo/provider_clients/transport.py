@@ -0,0 +1,81 @@
+import json, select, threading, http.client
+
+# Conexión HTTP keep-alive por hilo, compartida por los clientes de proveedor.
+# - Antes de reutilizar un socket se verifica que el servidor no lo haya cerrado por
+#   inactividad (un socket ocioso legible = EOF/RST), y si es así se reconecta.
+# - Un error al escribir la petición en un socket reutilizado (BrokenPipe/ConnectionReset)
+#   se reintenta una vez con conexión nueva, también en POST: la petición no llegó completa.
+# - Un error después de enviarla (al leer la respuesta) solo se reintenta en GET: el
+#   proveedor pudo haberla procesado y un POST repetido crearía un envelope duplicado.
+_STALE_WRITE = (BrokenPipeError, ConnectionResetError)
+
+def _dropped(conn) -> bool:
+    if conn.sock is None:
+        return False  # aún no conectado: http.client conecta en request()
+    try:
+        readable, _, _ = select.select([conn.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+class KeepAlive:
+    def __init__(self, base: str, timeout: float = 30):
+        self.base = base
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and _dropped(conn):
+            self._drop(conn)
+            conn = None
+        if conn is None:
+            if self.base.startswith("https://"):
+                host = self.base.replace("https://", "")
+                conn = http.client.HTTPSConnection(host, timeout=self.timeout)
+            else:
+                host = self.base.replace("http://", "")
+                conn = http.client.HTTPConnection(host, timeout=self.timeout)
+            self._local.conn = conn
+            self._local.reused = False
+        return conn
+
+    def _drop(self, conn):
+        conn.close()
+        self._local.conn = None
+
+    def send(self, method, path, payload, headers):
+        for attempt in (0, 1):
+            conn = self._conn()
+            reused = self._local.reused
+            try:
+                conn.request(method, path, payload, headers)
+            except (http.client.HTTPException, OSError) as e:
+                self._drop(conn)
+                retry = method == "GET" or (reused and isinstance(e, _STALE_WRITE))
+                if attempt or not retry:
+                    raise
+                continue
+            try:
+                resp = conn.getresponse()
+                data = resp.read()
+            except (http.client.HTTPException, OSError):
+                self._drop(conn)
+                if attempt or method != "GET":
+                    raise
+                continue
+            if resp.will_close:
+                self._drop(conn)
+            else:
+                self._local.reused = True
+            return resp.status, resp.reason, data
+
+def envelope_id(data: bytes):
+    """Id del envelope en la respuesta JSON del proveedor ("id" o "envelope_id"), o None."""
+    try:
+        body = json.loads(data)
+    except ValueError:
+        return None
+    if not isinstance(body, dict): return None
+    eid = body.get("id") or body.get("envelope_id")
+    return str(eid) if eid else None
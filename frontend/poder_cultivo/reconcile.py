@@ -0,0 +1,91 @@
+import os, time, argparse, datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import storage
+from admission import TokenBucket
+from provider_clients import ecert as ecert_client
+from provider_clients import idok as idok_client
+
+# Reconciliación de poderes atascados en sent_to_sign (webhooks perdidos).
+# Recorre las filas antiguas por índice, consulta el estado en el proveedor (en lote si
+# el proveedor lo permite; si no, llamadas concurrentes con tope de tasa) y aplica las
+# correcciones en una transacción por página.
+#
+# Uso: python reconcile.py --older-than 30 --page-size 500 --concurrency 8 --rate 10
+CLIENTS = {"ecert": ecert_client, "idok": idok_client}
+
+def _wait(bucket):
+    if bucket is None:
+        return  # sin tope de tasa
+    while not bucket.take():
+        time.sleep(bucket.wait_time())
+
+def _statuses(provider: str, envelope_ids, pool: ThreadPoolExecutor, bucket) -> dict:
+    client = CLIENTS[provider]
+    if hasattr(client, "get_envelopes_status"):
+        out = {}
+        for i in range(0, len(envelope_ids), client.BATCH_SIZE):
+            chunk = envelope_ids[i:i + client.BATCH_SIZE]
+            _wait(bucket)
+            try:
+                out.update(client.get_envelopes_status(chunk))
+            except Exception:
+                out.update({eid: None for eid in chunk})
+        return out
+
+    def one(eid):
+        _wait(bucket)
+        try:
+            return eid, client.get_envelope_status(eid)
+        except Exception:
+            return eid, None
+    return dict(pool.map(one, envelope_ids))
+
+def reconcile(older_than_minutes: int = 30, page_size: int = 500, concurrency: int = 8, rate: float = 10) -> dict:
+    cutoff = (datetime.datetime.utcnow() - datetime.timedelta(minutes=older_than_minutes)).isoformat()
+    counts = {"changed": 0, "unchanged": 0, "unknown": 0}
+    # rate <= 0: sin tope (un bucket con tasa 0 nunca se recarga)
+    bucket = TokenBucket(rate, max(1, int(rate))) if rate > 0 else None
+    after = ("", 0)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while True:
+            rows = storage.list_stale("sent_to_sign", cutoff, after, page_size)
+            if not rows: break
+            after = (rows[-1]["updated_at"], rows[-1]["id"])
+
+            by_provider = {}
+            for r in rows:
+                eid = r["provider_envelope_id"]
+                if r["provider"] not in CLIENTS or not eid or eid == "TBD":
+                    counts["unknown"] += 1
+                    continue
+                by_provider.setdefault(r["provider"], []).append(r)
+
+            updates = []
+            for provider, prows in by_provider.items():
+                found = _statuses(provider, [r["provider_envelope_id"] for r in prows], pool, bucket)
+                for r in prows:
+                    new = found.get(r["provider_envelope_id"])
+                    if new is None:
+                        counts["unknown"] += 1
+                    elif new == "sent_to_sign":
+                        counts["unchanged"] += 1
+                    else:
+                        updates.append((r["id"], new))
+            if updates:
+                # Las filas que un webhook ya movió en paralelo no se tocan (cuentan como unchanged)
+                changed = storage.update_status_many(updates, "sent_to_sign")
+                counts["changed"] += changed
+                counts["unchanged"] += len(updates) - changed
+    return counts
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Reconcilia poderes en sent_to_sign con el proveedor de firma")
+    ap.add_argument("--older-than", type=int, default=int(os.environ.get("RECONCILE_OLDER_THAN_MIN", "30")),
+                    help="minutos sin actualización para considerar un poder atascado")
+    ap.add_argument("--page-size", type=int, default=500)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--rate", type=float, default=10, help="llamadas/seg máximas al proveedor (0 = sin tope)")
+    args = ap.parse_args()
+    storage.init_db()
+    print(reconcile(args.older_than, args.page_size, args.concurrency, args.rate))
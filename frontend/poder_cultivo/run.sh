@@ -1,6 +1,11 @@
 #!/usr/bin/env bash
+# Uso: ./run.sh        → desarrollo (un proceso, --reload)
+#      ./run.sh prod   → producción (gunicorn + N workers uvicorn, ver gunicorn.conf.py)
 set -e
 python3 -m venv .venv
 source .venv/bin/activate
 pip install -r requirements.txt
+if [ "${1:-dev}" = "prod" ]; then
+  exec gunicorn -c gunicorn.conf.py app:app
+fi
 uvicorn app:app --host 0.0.0.0 --port 8000 --reload
@@ -0,0 +1,31 @@
+import re
+from functools import lru_cache
+from typing import Annotated
+from pydantic import AfterValidator
+
+# RUT chileno: acepta "12.345.678-5", "12345678-5", "123456785", "12345678-k" y lo
+# normaliza a "12345678-5" (sin puntos, DV en mayúscula) verificando el dígito (módulo 11).
+_RUT_RE = re.compile(r"(\d{1,2}(?:\.\d{3}){2}|\d{1,3}\.\d{3}|\d{1,8})-?([0-9kK])")
+
+def digito_verificador(cuerpo: int) -> str:
+    total, factor = 0, 2
+    while cuerpo:
+        total += (cuerpo % 10) * factor
+        cuerpo //= 10
+        factor = 2 if factor == 7 else factor + 1
+    dv = 11 - total % 11
+    return "0" if dv == 11 else "K" if dv == 10 else str(dv)
+
+@lru_cache(maxsize=4096)
+def normalize_rut(value: str) -> str:
+    """RUT canónico o ValueError. Cacheado: en lotes se repiten los mismos RUT (p. ej. el cesionario)."""
+    m = _RUT_RE.fullmatch(value.strip().replace(" ", ""))
+    if not m:
+        raise ValueError("RUT con formato inválido")
+    cuerpo = int(m.group(1).replace(".", ""))
+    dv = m.group(2).upper()
+    if cuerpo == 0 or digito_verificador(cuerpo) != dv:
+        raise ValueError("RUT con dígito verificador inválido")
+    return f"{cuerpo}-{dv}"
+
+Rut = Annotated[str, AfterValidator(normalize_rut)]
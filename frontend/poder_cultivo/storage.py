@@ -16,8 +16,80 @@ def init_db():
             updated_at TEXT NOT NULL
         )'''
     )
+    # Para la reconciliación de poderes atascados en sent_to_sign (reconcile.py)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_poder_status_updated ON poder (status, updated_at, id)")
+    # Textos de declaración deduplicados: cada poder guarda solo "declaracion_ref" (sha256)
+    cur.execute(
+        '''CREATE TABLE IF NOT EXISTS declaracion (
+            hash TEXT PRIMARY KEY,
+            texto TEXT NOT NULL,
+            version TEXT,
+            created_at TEXT NOT NULL
+        )'''
+    )
+    conn.commit()
+    conn.close()
+
+def intern_declaracion(h: str, texto: str, version: str = None):
+    conn = sqlite3.connect(DB_PATH)
+    cur = conn.cursor()
+    cur.execute("INSERT OR IGNORE INTO declaracion (hash, texto, version, created_at) VALUES (?, ?, ?, ?)",
+                (h, texto, version, datetime.datetime.utcnow().isoformat()))
+    if version:
+        cur.execute("UPDATE declaracion SET version = ? WHERE hash = ? AND version IS NULL", (version, h))
+    conn.commit()
+    conn.close()
+
+def get_declaracion(h: str):
+    conn = sqlite3.connect(DB_PATH)
+    cur = conn.cursor()
+    cur.execute("SELECT texto FROM declaracion WHERE hash = ?", (h,))
+    row = cur.fetchone()
+    conn.close()
+    return row[0] if row else None
+
+def list_poder_data(after_id: int = 0, limit: int = 500):
+    conn = sqlite3.connect(DB_PATH)
+    cur = conn.cursor()
+    cur.execute("SELECT id, data_json FROM poder WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit))
+    rows = [(r[0], json.loads(r[1])) for r in cur.fetchall()]
+    conn.close()
+    return rows
+
+def update_poder_data_many(items):
+    """items: [(pid, data_dict)] en una sola transacción. No toca updated_at: es una
+    compactación de datos y reconcile.py usa updated_at para detectar poderes atascados."""
+    conn = sqlite3.connect(DB_PATH)
+    cur = conn.cursor()
+    cur.executemany("UPDATE poder SET data_json = ? WHERE id = ?",
+                    [(json.dumps(d, ensure_ascii=False), pid) for pid, d in items])
+    conn.commit()
+    conn.close()
+
+def list_stale(status: str, before: str, after=("", 0), limit: int = 500):
+    """Poderes en `status` con updated_at < before, paginados por (updated_at, id) sobre el índice."""
+    conn = sqlite3.connect(DB_PATH)
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT id, provider, provider_envelope_id, updated_at FROM poder "
+        "WHERE status = ? AND updated_at < ? AND (updated_at, id) > (?, ?) "
+        "ORDER BY updated_at, id LIMIT ?",
+        (status, before, after[0], after[1], limit))
+    rows = [{"id": r[0], "provider": r[1], "provider_envelope_id": r[2], "updated_at": r[3]} for r in cur.fetchall()]
+    conn.close()
+    return rows
+
+def update_status_many(items, expected_status: str):
+    """items: [(pid, status)] en una sola transacción; solo cambia filas que siguen en expected_status."""
+    now = datetime.datetime.utcnow().isoformat()
+    conn = sqlite3.connect(DB_PATH)
+    cur = conn.cursor()
+    cur.executemany("UPDATE poder SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                    [(status, now, pid, expected_status) for pid, status in items])
     conn.commit()
+    changed = cur.rowcount
     conn.close()
+    return changed
 
 def insert_poder(data: dict) -> int:
     now = datetime.datetime.utcnow().isoformat()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor de parches declarativos (reemplaza los scripts fix_*.js / apply_*.py de un solo uso)
+
+Uso:
+    python patch_engine.py patches/poder_cultivo_canvas.json            # aplica
+    python patch_engine.py patches/poder_cultivo_canvas.json --dry-run  # muestra diff, no escribe
+    python patch_engine.py patches/poder_cultivo_canvas.json --check    # exit 1 si hay cambios pendientes
+
+Ojo: patches/ puede contener variantes alternativas del mismo arreglo; no usar patches/*.json.
+
+Formato de un rule set (JSON):
+    {
+      "name": "...",
+      "files": ["frontend/**/*.html"],          # globs relativos a --root
+      "stackable": false,                        # true: combinable con otros rule sets sobre el mismo archivo
+      "rules": [
+        {"name": "...", "type": "literal", "find": "...", "replace": "...", "count": 0},
+        {"name": "...", "type": "regex", "pattern": "...", "replace": "\\1", "flags": ["DOTALL"]},
+        {"name": "...", "type": "block", "start": "function foo(id) {", "replace_file": "foo.js"}
+      ]
+    }
+
+- "replace_file" es relativo al JSON (se elimina un salto de línea final); en regex se
+  inserta literal, mientras que "replace" admite referencias a grupos.
+- "block" busca el texto "start" (terminado en "{") y reemplaza hasta la llave que lo
+  cierra con un recorrido lineal que salta strings y comentarios, en vez de regex
+  anidadas tipo [^}]*(\{[^}]*\})* que pueden caer en backtracking catastrófico.
+- Cada archivo se lee una vez, se aplican todas las reglas en memoria y se escribe una
+  sola vez (solo si cambió). Los archivos se procesan en paralelo.
+- Un archivo que recibe reglas de más de un rule set se rechaza, salvo que todos esos
+  rule sets declaren "stackable": true (evita mezclar variantes alternativas).
+- Tras aplicar, las reglas se vuelven a ejecutar sobre el resultado: si cambia de nuevo
+  el rule set no es idempotente y el archivo no se escribe.
+"""
+
+import argparse
+import difflib
+import glob
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+FLAGS = {"IGNORECASE": re.IGNORECASE, "MULTILINE": re.MULTILINE, "DOTALL": re.DOTALL}
+
+
+class RuleError(Exception):
+    pass
+
+
+def _read_replacement(rule, base_dir):
+    if "replace_file" in rule:
+        with open(os.path.join(base_dir, rule["replace_file"]), encoding="utf-8") as f:
+            text = f.read()
+        return text[:-1] if text.endswith("\n") else text, True
+    return rule.get("replace", ""), False
+
+
+def compile_ruleset(path):
+    """Carga un rule set y compila sus patrones (una sola vez por proceso)."""
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    rules = []
+    for i, rule in enumerate(spec.get("rules", [])):
+        name = rule.get("name", f"rule-{i}")
+        kind = rule.get("type", "literal")
+        replacement, from_file = _read_replacement(rule, base_dir)
+        count = int(rule.get("count", 0))
+        if kind == "literal":
+            rules.append((name, kind, rule["find"], replacement, count))
+        elif kind == "regex":
+            flags = 0
+            for flag in rule.get("flags", []):
+                flags |= FLAGS[flag]
+            try:
+                pattern = re.compile(rule["pattern"], flags)
+            except re.error as e:
+                raise RuleError(f"{path}: regla {name}: {e}")
+            if from_file:
+                replacement = (lambda text: lambda m: text)(replacement)
+            rules.append((name, kind, pattern, replacement, count))
+        elif kind == "block":
+            if not rule["start"].rstrip().endswith("{"):
+                raise RuleError(f"{path}: regla {name}: 'start' debe terminar en '{{'")
+            rules.append((name, kind, rule["start"], replacement, count))
+        else:
+            raise RuleError(f"{path}: regla {name}: tipo desconocido {kind!r}")
+    return {"name": spec.get("name", os.path.basename(path)), "files": spec.get("files", []), "rules": rules,
+            "stackable": bool(spec.get("stackable", False))}
+
+
+def _skip_string(text, i, quote):
+    i += 1
+    while i < len(text):
+        c = text[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == quote:
+            return i + 1
+        i += 1
+    return i
+
+
+def find_block_end(text, open_idx):
+    """Índice siguiente a la llave que cierra la abierta en open_idx, o -1."""
+    depth = 0
+    i = open_idx
+    n = len(text)
+    while i < n:
+        c = text[i]
+        if c in "'\"`":
+            i = _skip_string(text, i, c)
+            continue
+        if c == "/" and i + 1 < n:
+            nxt = text[i + 1]
+            if nxt == "/":
+                j = text.find("\n", i)
+                i = n if j < 0 else j
+                continue
+            if nxt == "*":
+                j = text.find("*/", i + 2)
+                i = n if j < 0 else j + 2
+                continue
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return -1
+
+
+def _apply_block(text, start, replacement, count):
+    out = []
+    pos = 0
+    hits = 0
+    while not count or hits < count:
+        idx = text.find(start, pos)
+        if idx < 0:
+            break
+        end = find_block_end(text, idx + len(start.rstrip()) - 1)
+        if end < 0:
+            break
+        out.append(text[pos:idx])
+        out.append(replacement)
+        pos = end
+        hits += 1
+    out.append(text[pos:])
+    return "".join(out), hits
+
+
+def apply_rules(text, rules):
+    """Aplica las reglas en orden sobre el texto. Retorna (texto, {regla: coincidencias})."""
+    hits = {}
+    for name, kind, pattern, replacement, count in rules:
+        if kind == "literal":
+            n = text.count(pattern)
+            if count:
+                n = min(n, count)
+            if n:
+                text = text.replace(pattern, replacement, count or -1)
+        elif kind == "regex":
+            text, n = pattern.subn(replacement, text, count=count)
+        else:
+            text, n = _apply_block(text, pattern, replacement, count)
+        hits[name] = n
+    return text, hits
+
+
+# --- Ejecución en paralelo -------------------------------------------------
+
+_RULESETS = []
+
+
+def _init_worker(paths):
+    global _RULESETS
+    _RULESETS = [compile_ruleset(p) for p in paths]
+
+
+def _process(job):
+    path, label, ruleset_idxs, mode = job
+    rules = [r for i in ruleset_idxs for r in _RULESETS[i]["rules"]]
+    try:
+        with open(path, encoding="utf-8", newline="") as f:
+            original = f.read()
+    except UnicodeDecodeError:
+        return {"path": path, "changed": False, "hits": {}, "idempotent": True, "diff": "", "skipped": True}
+    patched, hits = apply_rules(original, rules)
+    again, _ = apply_rules(patched, rules)
+    result = {"path": path, "changed": patched != original, "hits": hits, "idempotent": again == patched, "diff": "",
+              "skipped": False}
+    if result["changed"] and mode == "dry-run":
+        result["diff"] = "".join(difflib.unified_diff(
+            original.splitlines(True), patched.splitlines(True), f"a/{label}", f"b/{label}"))
+    if result["changed"] and result["idempotent"] and mode == "apply":
+        tmp = path + ".patch-tmp"
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            f.write(patched)
+        os.replace(tmp, path)
+    return result
+
+
+def run(ruleset_paths, root=".", mode="apply", jobs=None):
+    rulesets = [compile_ruleset(p) for p in ruleset_paths]  # valida antes de lanzar workers
+    targets = {}
+    for idx, rs in enumerate(rulesets):
+        for pattern in rs["files"]:
+            for path in glob.glob(os.path.join(root, pattern), recursive=True):
+                if os.path.isfile(path):
+                    idxs = targets.setdefault(os.path.normpath(path), [])
+                    if idx not in idxs:
+                        idxs.append(idx)
+    for path, idxs in targets.items():
+        if len(idxs) > 1 and not all(rulesets[i]["stackable"] for i in idxs):
+            names = ", ".join(rulesets[i]["name"] for i in idxs)
+            raise RuleError(f"{path}: varios rule sets no combinables ({names}); aplique uno solo "
+                            "o márquelos con \"stackable\": true")
+    work = [(path, os.path.relpath(path, root), idxs, mode) for path, idxs in sorted(targets.items())]
+    if not work:
+        return []
+    if len(work) == 1 or jobs == 1:
+        _init_worker(ruleset_paths)
+        return [_process(w) for w in work]
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(ruleset_paths,)) as pool:
+        return list(pool.map(_process, work, chunksize=max(1, len(work) // 64)))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Aplica rule sets de parches declarativos sobre el árbol")
+    ap.add_argument("rulesets", nargs="+", help="archivos JSON de reglas")
+    ap.add_argument("--root", default=".", help="raíz para los globs de 'files'")
+    ap.add_argument("--dry-run", action="store_true", help="muestra el diff sin escribir")
+    ap.add_argument("--check", action="store_true", help="no escribe; exit 1 si hay cambios pendientes")
+    ap.add_argument("-j", "--jobs", type=int, default=None, help="procesos en paralelo")
+    args = ap.parse_args(argv)
+    mode = "dry-run" if args.dry_run else "check" if args.check else "apply"
+
+    try:
+        results = run(args.rulesets, args.root, mode, args.jobs)
+    except RuleError as e:
+        print(f'❌ {e}')
+        return 2
+
+    pending = 0
+    for r in results:
+        if r["skipped"]:
+            print(f'⚠️  {r["path"]}: no es UTF-8, se omite')
+            continue
+        applied = ", ".join(f"{k}={v}" for k, v in r["hits"].items() if v) or "sin coincidencias"
+        if not r["idempotent"]:
+            print(f'⚠️  {r["path"]}: reglas no idempotentes, no se escribe ({applied})')
+            pending += 1
+        elif r["changed"]:
+            pending += 1
+            verb = "actualizado" if mode == "apply" else "cambios pendientes"
+            print(f'✅ {r["path"]}: {verb} ({applied})')
+        if r["diff"]:
+            sys.stdout.write(r["diff"])
+    print(f'📝 {len(results)} archivos revisados, {pending} con cambios')
+    return 1 if mode == "check" and pending else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+function initPoderCultivoCanvas() {
+    console.log('🎨 initPoderCultivoCanvas llamado');
+    if (poderCultivoCanvasInitialized) {
+        console.log('⚠️ Canvas ya inicializado, reinicializando...');
+        poderCultivoCanvasInitialized = false;
+    }
+    
+    // Solo inicializar el canvas del cedente (el usuario firma)
+    const cedenteCanvas = document.getElementById('sigCedentePoder');
+    if (cedenteCanvas) {
+        console.log('✅ Canvas sigCedentePoder encontrado en el DOM');
+        setTimeout(() => {
+            console.log('⏱️ Inicializando canvas después de timeout...');
+            setupPoderSignatureCanvas('sigCedentePoder');
+        }, 300);
+    } else {
+        console.warn('⚠️ Canvas sigCedentePoder no encontrado, intentando de nuevo...');
+        setTimeout(() => {
+            const canvas = document.getElementById('sigCedentePoder');
+            if (canvas) {
+                console.log('✅ Canvas encontrado en segundo intento');
+                setupPoderSignatureCanvas('sigCedentePoder');
+            } else {
+                console.error('❌ Canvas sigCedentePoder no encontrado después de reintento');
+            }
+        }, 500);
+    }
+    
+    // La firma del cesionario es fija (imagen del dispensario)
+    // No necesita canvas
+    
+    poderCultivoCanvasInitialized = true;
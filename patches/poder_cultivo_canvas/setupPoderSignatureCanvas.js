@@ -0,0 +1,120 @@
+function setupPoderSignatureCanvas(id) {
+    console.log(`🔧 Inicializando canvas ${id}...`);
+    const canvas = document.getElementById(id);
+    if (!canvas) {
+        console.error(`❌ Canvas ${id} no encontrado en el DOM`);
+        return;
+    }
+    
+    console.log(`✅ Canvas ${id} encontrado:`, canvas);
+    console.log(`📐 Dimensiones del canvas: ${canvas.clientWidth}x${canvas.clientHeight}`);
+    
+    const ctx = canvas.getContext('2d');
+    if (!ctx) {
+        console.error(`❌ No se pudo obtener el contexto 2D para ${id}`);
+        return;
+    }
+    
+    let drawing = false;
+    let prev = null;
+    
+    // Ajuste de tamaño para alta densidad
+    function resize() {
+        const ratio = Math.max(window.devicePixelRatio || 1, 1);
+        const rect = canvas.getBoundingClientRect();
+        const w = rect.width || canvas.clientWidth || 300;
+        const h = rect.height || canvas.clientHeight || 220;
+        
+        console.log(`📏 Resize canvas ${id}: ${w}x${h} (ratio: ${ratio})`);
+        
+        canvas.width = w * ratio;
+        canvas.height = h * ratio;
+        ctx.scale(ratio, ratio);
+        ctx.lineWidth = 2;
+        ctx.lineJoin = 'round';
+        ctx.lineCap = 'round';
+        ctx.strokeStyle = '#0f172a';
+        ctx.fillStyle = '#0f172a';
+    }
+    
+    resize();
+    if (window.ResizeObserver) {
+        new ResizeObserver(() => {
+            console.log(`🔄 ResizeObserver detectado para ${id}`);
+            resize();
+        }).observe(canvas);
+    }
+
+    function pos(e) {
+        const r = canvas.getBoundingClientRect();
+        if (e.touches && e.touches.length) {
+            return { 
+                x: e.touches[0].clientX - r.left, 
+                y: e.touches[0].clientY - r.top 
+            };
+        } else {
+            return { 
+                x: e.clientX - r.left, 
+                y: e.clientY - r.top 
+            };
+        }
+    }
+
+    function start(e) {
+        console.log(`🖱️ Start drawing en ${id}`);
+        drawing = true;
+        prev = pos(e);
+        // Dibujar un punto inicial para asegurar que se vea algo
+        ctx.beginPath();
+        ctx.arc(prev.x, prev.y, 1, 0, 2 * Math.PI);
+        ctx.fill();
+        e.preventDefault();
+        e.stopPropagation();
+    }
+    
+    function move(e) {
+        if (!drawing) return;
+        const p = pos(e);
+        ctx.beginPath();
+        ctx.moveTo(prev.x, prev.y);
+        ctx.lineTo(p.x, p.y);
+        ctx.stroke();
+        prev = p;
+        e.preventDefault();
+        e.stopPropagation();
+    }
+    
+    function end(e) {
+        if (drawing) {
+            console.log(`🖱️ End drawing en ${id}`);
+            drawing = false;
+            prev = null;
+        }
+        if (e) {
+            e.preventDefault();
+            e.stopPropagation();
+        }
+    }
+
+    // Asegurar que el canvas sea completamente interactivo
+    canvas.style.cursor = 'crosshair';
+    canvas.style.touchAction = 'none';
+    canvas.style.pointerEvents = 'auto';
+    canvas.style.userSelect = 'none';
+    canvas.style.webkitUserSelect = 'none';
+    canvas.style.msUserSelect = 'none';
+    
+    // Agregar todos los event listeners necesarios
+    canvas.addEventListener('mousedown', start, { passive: false });
+    canvas.addEventListener('mousemove', move, { passive: false });
+    canvas.addEventListener('mouseup', end, { passive: false });
+    canvas.addEventListener('mouseleave', end, { passive: false });
+    canvas.addEventListener('mouseout', end, { passive: false });
+    
+    canvas.addEventListener('touchstart', start, { passive: false });
+    canvas.addEventListener('touchmove', move, { passive: false });
+    canvas.addEventListener('touchend', end, { passive: false });
+    canvas.addEventListener('touchcancel', end, { passive: false });
+    
+    console.log(`✅ Canvas de firma ${id} inicializado correctamente con ${canvas.width}x${canvas.height} píxeles`);
+}
@@ -0,0 +1,6 @@
+            const header = container?.querySelector('.poder-cultivo-header');
+            if (header) header.style.display = 'flex';
+            // Inicializar canvas después de que el DOM esté completamente renderizado
+            setTimeout(() => {
+                initPoderCultivoCanvas();
+            }, 500);
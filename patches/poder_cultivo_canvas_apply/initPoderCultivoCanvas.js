@@ -0,0 +1,25 @@
+// Inicializar canvas de firmas
+function initPoderCultivoCanvas() {
+    console.log('🎨 initPoderCultivoCanvas llamado');
+    
+    // Función helper para verificar si el canvas está listo
+    function waitForCanvas(id, callback, maxAttempts = 10, attempt = 0) {
+        const canvas = document.getElementById(id);
+        if (canvas && canvas.clientWidth > 0 && canvas.clientHeight > 0) {
+            console.log(`✅ Canvas ${id} está listo: ${canvas.clientWidth}x${canvas.clientHeight}`);
+            callback();
+        } else if (attempt < maxAttempts) {
+            console.log(`⏳ Esperando canvas ${id}... (intento ${attempt + 1}/${maxAttempts})`);
+            setTimeout(() => waitForCanvas(id, callback, maxAttempts, attempt + 1), 200);
+        } else {
+            console.error(`❌ Canvas ${id} no está disponible después de ${maxAttempts} intentos`);
+        }
+    }
+    
+    // Solo inicializar el canvas del cedente (el usuario firma)
+    // La firma del cesionario es fija (imagen del dispensario)
+    waitForCanvas('sigCedentePoder', () => {
+        console.log('🚀 Inicializando canvas sigCedentePoder...');
+        setupPoderSignatureCanvas('sigCedentePoder');
+        poderCultivoCanvasInitialized = true;
+    });
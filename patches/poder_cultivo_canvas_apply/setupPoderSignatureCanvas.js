@@ -0,0 +1,128 @@
+function setupPoderSignatureCanvas(id) {
+    console.log(`🔧 Inicializando canvas ${id}...`);
+    const canvas = document.getElementById(id);
+    if (!canvas) {
+        console.error(`❌ Canvas ${id} no encontrado`);
+        return;
+    }
+    
+    console.log(`✅ Canvas ${id} encontrado: ${canvas.clientWidth}x${canvas.clientHeight}`);
+    
+    const ctx = canvas.getContext('2d');
+    if (!ctx) {
+        console.error(`❌ No se pudo obtener contexto 2D`);
+        return;
+    }
+    
+    let drawing = false;
+    let prev = null;
+    
+    // Ajuste de tamaño para alta densidad
+    function resize() {
+        const ratio = Math.max(window.devicePixelRatio || 1, 1);
+        const rect = canvas.getBoundingClientRect();
+        const w = rect.width || canvas.clientWidth || 300;
+        const h = rect.height || canvas.clientHeight || 220;
+        
+        if (w > 0 && h > 0) {
+            canvas.width = w * ratio;
+            canvas.height = h * ratio;
+            ctx.scale(ratio, ratio);
+            ctx.lineWidth = 2;
+            ctx.lineJoin = 'round';
+            ctx.lineCap = 'round';
+            ctx.strokeStyle = '#0f172a';
+            ctx.fillStyle = '#0f172a';
+            console.log(`📏 Canvas ${id} redimensionado: ${w}x${h} (ratio: ${ratio})`);
+        }
+    }
+    
+    resize();
+    if (window.ResizeObserver) {
+        new ResizeObserver(() => {
+            resize();
+        }).observe(canvas);
+    }
+
+    function pos(e) {
+        const r = canvas.getBoundingClientRect();
+        if (e.touches && e.touches.length) {
+            return { 
+                x: e.touches[0].clientX - r.left, 
+                y: e.touches[0].clientY - r.top 
+            };
+        } else {
+            return { 
+                x: e.clientX - r.left, 
+                y: e.clientY - r.top 
+            };
+        }
+    }
+
+    function start(e) {
+        console.log(`🖱️ Start drawing en ${id}`, { x: prev?.x, y: prev?.y });
+        drawing = true;
+        prev = pos(e);
+        // Dibujar un punto inicial para asegurar que se vea algo
+        ctx.beginPath();
+        ctx.arc(prev.x, prev.y, 1, 0, 2 * Math.PI);
+        ctx.fill();
+        e.preventDefault();
+        e.stopPropagation();
+    }
+    
+    function move(e) {
+        if (!drawing) return;
+        const p = pos(e);
+        ctx.beginPath();
+        ctx.moveTo(prev.x, prev.y);
+        ctx.lineTo(p.x, p.y);
+        ctx.stroke();
+        prev = p;
+        e.preventDefault();
+        e.stopPropagation();
+    }
+    
+    function end(e) {
+        if (drawing) {
+            console.log(`🖱️ End drawing en ${id}`);
+            drawing = false;
+            prev = null;
+        }
+        if (e) {
+            e.preventDefault();
+            e.stopPropagation();
+        }
+    }
+
+    // Asegurar que el canvas sea completamente interactivo
+    canvas.style.cursor = 'crosshair';
+    canvas.style.touchAction = 'none';
+    canvas.style.pointerEvents = 'auto';
+    canvas.style.userSelect = 'none';
+    canvas.style.webkitUserSelect = 'none';
+    canvas.style.msUserSelect = 'none';
+    
+    // Limpiar listeners anteriores (si existen)
+    const newCanvas = canvas.cloneNode(true);
+    canvas.parentNode.replaceChild(newCanvas, canvas);
+    const freshCanvas = document.getElementById(id);
+    const freshCtx = freshCanvas.getContext('2d');
+    
+    // Re-aplicar resize
+    resize();
+    
+    // Agregar todos los event listeners necesarios
+    freshCanvas.addEventListener('mousedown', start, { passive: false });
+    freshCanvas.addEventListener('mousemove', move, { passive: false });
+    freshCanvas.addEventListener('mouseup', end, { passive: false });
+    freshCanvas.addEventListener('mouseleave', end, { passive: false });
+    freshCanvas.addEventListener('mouseout', end, { passive: false });
+    
+    freshCanvas.addEventListener('touchstart', start, { passive: false });
+    freshCanvas.addEventListener('touchmove', move, { passive: false });
+    freshCanvas.addEventListener('touchend', end, { passive: false });
+    freshCanvas.addEventListener('touchcancel', end, { passive: false });
+    
+    console.log(`✅ Canvas ${id} inicializado correctamente`);
+}